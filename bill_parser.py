@@ -6,7 +6,8 @@
 import pandas as pd
 import os
 from typing import List
-import json
+
+from utils import json_loads
 
 
 class BillParser:
@@ -14,8 +15,8 @@ class BillParser:
     
     def __init__(self, config_file: str = "config.json"):
         """初始化解析器，加载配置（分类规则等预留使用）"""
-        with open(config_file, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        with open(config_file, 'rb') as f:
+            self.config = json_loads(f.read())
     
     def parse_wechat_bill(self, file_path: str) -> pd.DataFrame:
         """解析微信账单文件
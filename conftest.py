@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+pytest共享夹具
+整个测试会话只创建一个QApplication和一个MainWindow
+
+运行方式: pytest -q
+安装pytest-xdist后可并行: pytest -n auto -q（每个worker进程各自创建QApplication）
+标记为gui的稳定性测试默认跳过，加 --gui 运行
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 无显示环境下使用offscreen平台；须在任何测试模块创建QApplication之前设置
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--gui", action="store_true", default=False,
+                     help="运行标记为gui的界面稳定性测试")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "gui: 完整界面稳定性测试，默认跳过，使用--gui运行")
+
+
+def pytest_collection_modifyitems(config, items):
+    """未指定--gui时跳过gui标记的测试"""
+    if config.getoption("--gui"):
+        return
+    skip_gui = pytest.mark.skip(reason="界面稳定性测试，使用 --gui 运行")
+    for item in items:
+        if "gui" in item.keywords:
+            item.add_marker(skip_gui)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """会话级QApplication，已存在时直接复用"""
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture(autouse=True)
+def _no_modal_dialogs(monkeypatch):
+    """屏蔽QMessageBox的模态对话框：offscreen下无人点击会一直阻塞
+
+    information/warning/critical 直接返回Ok，question 返回Yes。
+    """
+    try:
+        from PyQt6.QtWidgets import QMessageBox
+    except ImportError:
+        return
+    button = QMessageBox.StandardButton
+    for name in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: button.Ok))
+    monkeypatch.setattr(QMessageBox, "question", staticmethod(lambda *args, **kwargs: button.Yes))
+
+
+# 测试之间需要还原的筛选/视图下拉框和日历年月
+_WINDOW_COMBOS = ("platform_filter", "category_filter", "status_filter",
+                  "view_mode", "classification_standard", "calendar_classification")
+_WINDOW_SPINS = ("year_spin", "month_spin")
+
+
+def _window_state(main_window):
+    """记录下拉框的选项和当前项以及年月的值"""
+    combos = {}
+    for name in _WINDOW_COMBOS:
+        combo = getattr(main_window, name)
+        combos[name] = ([combo.itemText(i) for i in range(combo.count())], combo.currentIndex())
+    spins = {name: getattr(main_window, name).value() for name in _WINDOW_SPINS}
+    return combos, spins
+
+
+def _restore_window_state(main_window, state):
+    """还原数据和控件状态；屏蔽信号，避免还原过程中触发刷新"""
+    combos, spins = state
+    main_window.df = None
+    main_window.df_filtered = None
+    main_window.stats = None
+    main_window.report_text = None
+    for name, (items, index) in combos.items():
+        combo = getattr(main_window, name)
+        combo.blockSignals(True)
+        try:
+            combo.clear()
+            combo.addItems(items)
+            combo.setCurrentIndex(index)
+        finally:
+            combo.blockSignals(False)
+    for name, value in spins.items():
+        spin = getattr(main_window, name)
+        spin.blockSignals(True)
+        try:
+            spin.setValue(value)
+        finally:
+            spin.blockSignals(False)
+
+
+@pytest.fixture(scope="session")
+def _session_window(qapp):
+    """会话级主窗口，只创建一次；连同初始控件状态一起返回"""
+    from main_gui import MainWindow
+    main_window = MainWindow()
+    yield main_window, _window_state(main_window)
+    main_window.close()
+
+
+@pytest.fixture
+def window(qapp, _session_window):
+    """每个测试开始前把会话级主窗口还原为初始状态，各测试自行设置df/df_filtered
+
+    测试结束后处理积压的Qt事件（deleteLater、重绘等），不留给下一个测试。
+    """
+    main_window, state = _session_window
+    _restore_window_state(main_window, state)
+    yield main_window
+    qapp.processEvents()
+
+
+# 解析结果依赖的源码，修改后缓存的解析结果失效
+_PARSER_SOURCES = ("bill_parser.py", "transaction_classifier.py")
+
+
+def _bills_signature(bill_files, config):
+    """账单解析缓存键：各账单文件的(绝对路径, 修改时间, 大小) + 分类规则 + 解析相关源码的哈希"""
+    files = []
+    for file_path in bill_files:
+        try:
+            st = os.stat(file_path)
+            files.append((os.path.abspath(file_path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            files.append((os.path.abspath(file_path), None, None))
+    rules = json.dumps(config.get('分类规则', {}), ensure_ascii=False, sort_keys=True)
+    sources = hashlib.sha256()
+    for name in _PARSER_SOURCES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            sources.update(f.read())
+    return tuple(files), rules, sources.hexdigest()
+
+
+@pytest.fixture(scope="session")
+def parsed_bills(request):
+    """会话级账单解析结果，供解析/分类/可视化测试共用
+
+    结果连同账单文件签名一起pickle到.pytest_cache/parsed_bills.pkl，
+    账单文件、分类规则和解析源码都未变化时复跑直接读取，跳过解析。
+    """
+    bills_dir = request.config.rootpath / "zhangdang"
+    if not bills_dir.exists():
+        pytest.skip("缺少zhangdang账单目录")
+
+    from bill_parser import BillParser
+    parser = BillParser()
+    signature = _bills_signature(parser.scan_bill_files(str(bills_dir)), parser.config)
+    cache_file = request.config.rootpath / ".pytest_cache" / "parsed_bills.pkl"
+    try:
+        with open(cache_file, "rb") as f:
+            cached_signature, cached_df = pickle.load(f)
+        if cached_signature == signature:
+            return cached_df
+    except Exception:
+        pass
+
+    df = parser.process_all_bills(str(bills_dir))
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        with open(cache_file, "wb") as f:
+            pickle.dump((signature, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        print(f"写入账单解析缓存失败: {e}")
+    return df
+
+
+@pytest.fixture(scope="session")
+def classified(parsed_bills):
+    """会话级分类结果和统计信息 (classified_df, stats)，分类与可视化测试共用"""
+    from transaction_classifier import TransactionClassifier
+    classifier = TransactionClassifier()
+    classified_df = classifier.classify_all_transactions(parsed_bills)
+    return classified_df, classifier.get_classification_statistics(classified_df)
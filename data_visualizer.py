@@ -10,13 +10,57 @@ from plotly.subplots import make_subplots
 import plotly.io as pio
 import pandas as pd
 import json
+import ast
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import os
+
+from utils import json_loads
+
 plt.switch_backend('Agg')  # 用Agg后端（仅生成图片文件，不启动GUI）
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']  # 解决中文显示问题
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 
+_STATS_AMOUNT_KEYS = ('总收入', '总支出', '净收入', '非收支总额')
+
+
+def _parse_stats_value(val):
+    """把字符串形式的统计值还原：dict/list的repr用literal_eval，其余沿用json"""
+    if not isinstance(val, str):
+        return val
+    if val.lstrip().startswith(('{', '[')):
+        try:
+            return ast.literal_eval(val)
+        except (ValueError, SyntaxError):
+            pass
+    try:
+        return json.loads(val.replace("'", '"'))
+    except Exception:
+        return val
+
+
+def _normalize_stats(stats: Dict) -> Dict:
+    for k, v in stats.items():
+        v = _parse_stats_value(v)
+        if isinstance(v, dict):
+            v = _normalize_stats(v)
+        stats[k] = v
+    for key in _STATS_AMOUNT_KEYS:
+        if key in stats:
+            try:
+                stats[key] = float(stats[key])
+            except Exception:
+                stats[key] = 0.0
+    return stats
+
+
+def parse_stats(stats):
+    """就地规范化stats：字符串化的嵌套dict解析回dict，金额字段转为float
+    已规范化的stats再次调用结果不变"""
+    if not isinstance(stats, dict):
+        return stats
+    return _normalize_stats(stats)
+
 
 class DataVisualizer:
     """数据可视化器"""
@@ -26,8 +70,8 @@ class DataVisualizer:
         - 设置中文字体为 SimHei（黑体），避免中文乱码
         - 读取颜色/字号配置
         """
-        with open(config_file, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        with open(config_file, 'rb') as f:
+            self.config = json_loads(f.read())
         
         # matplotlib 中文支持（备用）
         plt.rcParams['font.sans-serif'] = ['SimHei']
@@ -43,8 +87,9 @@ class DataVisualizer:
         return dict(text=text, font=dict(size=self.font_size + 4, family=self.font_family, color=self.text_color), x=0.5)
     
     def _axis(self, title: str) -> Dict:
-        return dict(title=title,
-                    titlefont=dict(size=self.font_size, family=self.font_family, color=self.text_color),
+        # title.font 写法plotly 5/6都支持（titlefont在plotly 6中已移除）
+        return dict(title=dict(text=title,
+                               font=dict(size=self.font_size, family=self.font_family, color=self.text_color)),
                     tickfont=dict(size=self.font_size - 2, family=self.font_family, color=self.text_color))
     
     def _legend(self) -> Dict:
@@ -77,7 +122,7 @@ class DataVisualizer:
         if data.empty:
             return self._empty_figure(f'{title}（无数据）')
         
-        category_stats = data.groupby(category_column)['金额'].sum().sort_values(ascending=False)
+        category_stats = data.groupby(category_column, observed=True)['金额'].sum().sort_values(ascending=False)
         category_stats = category_stats[category_stats > 0]
         if category_stats.empty:
             return self._empty_figure(f'{title}（金额为0）')
@@ -170,7 +215,8 @@ class DataVisualizer:
         if df is None or df.empty:
             return self._empty_figure('无数据')
         
-        df_copy = df.copy()
+        # 只新增日期列，浅复制即可
+        df_copy = df.copy(deep=False)
         df_copy['日期'] = pd.to_datetime(df_copy['交易时间'], errors='coerce')
         if df_copy['日期'].isna().all():
             return self._empty_figure('日期无效')
@@ -288,7 +334,7 @@ class DataVisualizer:
         if data.empty:
             return self._empty_figure(f'{title}（无数据）')
         
-        category_stats = data.groupby(category_column)['金额'].sum().sort_values(ascending=False)
+        category_stats = data.groupby(category_column, observed=True)['金额'].sum().sort_values(ascending=False)
         category_stats = category_stats[category_stats > 0]
         if category_stats.empty:
             return self._empty_figure(f'{title}（金额为0）')
@@ -346,27 +392,12 @@ class DataVisualizer:
         return base.replace('</body>', script + '\n</body>')
     
     def create_summary_report(self, stats: Dict, special: Optional[Dict] = None) -> str:
-        import json
         # 类型安全转换工具
-        def safe_float(val):
-            try:
-                return float(val)
-            except Exception:
-                return 0.0
         def safe_dict(val):
-            if isinstance(val, dict):
-                return val
-            if isinstance(val, str):
-                try:
-                    return json.loads(val.replace("'", '"'))
-                except Exception:
-                    return {}
-            return {}
+            return val if isinstance(val, dict) else {}
 
         # 修正stats中的金额字段和嵌套dict
-        for key in ['总收入', '总支出', '净收入', '非收支总额']:
-            if key in stats:
-                stats[key] = safe_float(stats[key])
+        parse_stats(stats)
         if '分类统计' in stats:
             stats['分类统计'] = safe_dict(stats['分类统计'])
         if '平台统计' in stats:
@@ -384,17 +415,13 @@ class DataVisualizer:
         report.append(f"非收支总额: ¥{stats.get('非收支总额', 0):.2f}")
         report.append("")
         report.append("【分类统计】")
-        classification_amounts = (stats.get('分类统计', {}) or {}).get('金额', {})
-        if isinstance(classification_amounts, str):
-            classification_amounts = safe_dict(classification_amounts)
+        classification_amounts = safe_dict((stats.get('分类统计', {}) or {}).get('金额', {}))
         for category, amount in sorted(classification_amounts.items(), key=lambda x: x[1], reverse=True):
             if amount > 0:
                 report.append(f"{category}: ¥{amount:.2f}")
         report.append("")
         report.append("【平台统计】")
-        platform_stats = stats.get('平台统计', {})
-        if isinstance(platform_stats, str):
-            platform_stats = safe_dict(platform_stats)
+        platform_stats = safe_dict(stats.get('平台统计', {}))
         for platform, data in platform_stats.items():
             if isinstance(data, dict) and 'sum' in data and 'count' in data:
                 report.append(f"{platform}: ¥{float(data['sum']):.2f} ({int(data['count'])}笔)")
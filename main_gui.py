@@ -19,7 +19,7 @@ import numpy as np
 
 from bill_parser import BillParser
 from transaction_classifier import TransactionClassifier
-from data_visualizer import DataVisualizer
+from data_visualizer import DataVisualizer, parse_stats
 
 # 导入数据恢复工具
 try:
@@ -70,10 +70,7 @@ class ProcessingThread(QThread):
                 stats = {}
             # 专项统计
             try:
-                special = {
-                    '"馒头"支出统计': classifier.get_special_statistics(classified_df, '馒头'),
-                    '理财退款统计': classifier.get_finance_refund_statistics(classified_df)
-                }
+                special = classifier.get_special_report(classified_df, '馒头')
             except Exception:
                 special = {}
             self.progress_updated.emit("统计信息生成完成", 95)
@@ -370,41 +367,9 @@ class MainWindow(QMainWindow):
 
     def processing_finished(self, df: pd.DataFrame, stats: dict, report_text: str):
         try:
-            import json
             # 递归修正stats所有dict和金额字段类型
-            def safe_json_load(val):
-                if isinstance(val, str):
-                    try:
-                        return json.loads(val.replace("'", '"'))
-                    except Exception:
-                        return val
-                return val
-
-            def safe_float(val):
-                try:
-                    return float(val)
-                except Exception:
-                    return 0.0
-
-            def fix_stats(stats):
-                if not isinstance(stats, dict):
-                    return stats
-                for k in list(stats.keys()):
-                    v = stats[k]
-                    if isinstance(v, str):
-                        v2 = safe_json_load(v)
-                        stats[k] = v2
-                        v = v2
-                    if isinstance(v, dict):
-                        stats[k] = fix_stats(v)
-                # 金额相关字段转float
-                for key in ['总收入', '总支出', '净收入', '非收支总额']:
-                    if key in stats:
-                        stats[key] = safe_float(stats[key])
-                return stats
-
             if stats is not None:
-                stats = fix_stats(stats)
+                stats = parse_stats(stats)
 
             # 清理和验证数据
             self.df = self.clean_dataframe(df)
@@ -444,10 +409,8 @@ class MainWindow(QMainWindow):
             validation = DataRecovery.validate_dataframe(cleaned_df)
             if not validation['is_valid']:
                 print(f"数据验证发现问题: {validation['issues']}")
-                # 尝试修复数据
-                cleaned_df = DataRecovery.fix_common_issues(cleaned_df)
             
-            # 使用数据恢复工具修复常见问题
+            # 使用数据恢复工具修复常见问题（只修复一次）
             cleaned_df = DataRecovery.fix_common_issues(cleaned_df)
             
             # 额外清理：处理可能损坏的字符串字段
@@ -579,7 +542,7 @@ class MainWindow(QMainWindow):
                 return
             
             # 计算分类统计
-            category_stats = filtered_data.groupby(category_column)['金额'].sum().sort_values(ascending=False)
+            category_stats = filtered_data.groupby(category_column, observed=True)['金额'].sum().sort_values(ascending=False)
             
             # 只显示前10个分类，其他归为"其他"
             if len(category_stats) > 10:
@@ -653,7 +616,7 @@ class MainWindow(QMainWindow):
                 return
             
             # 计算分类统计
-            category_stats = filtered_data.groupby(category_column)['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
+            category_stats = filtered_data.groupby(category_column, observed=True)['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
             
             # 只显示前15个分类
             category_stats = category_stats.head(15)
@@ -780,7 +743,7 @@ class MainWindow(QMainWindow):
             plt.rcParams['axes.unicode_minus'] = False
             
             # 计算平台统计
-            platform_stats = data.groupby('平台')['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
+            platform_stats = data.groupby('平台', observed=True)['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
             
             if platform_stats.empty:
                 return
@@ -1106,10 +1069,15 @@ class MainWindow(QMainWindow):
         if '调整后分类' in self.df.columns:
             categories = ['全部分类'] + sorted(self.df['调整后分类'].dropna().unique().tolist())
             current_category = self.category_filter.currentText()
-            self.category_filter.clear()
-            self.category_filter.addItems(categories)
-            if current_category in categories:
-                self.category_filter.setCurrentText(current_category)
+            # 重建选项时屏蔽currentTextChanged，否则会再次触发筛选刷新并无限递归
+            self.category_filter.blockSignals(True)
+            try:
+                self.category_filter.clear()
+                self.category_filter.addItems(categories)
+                if current_category in categories:
+                    self.category_filter.setCurrentText(current_category)
+            finally:
+                self.category_filter.blockSignals(False)
 
     def update_statistics_tab(self):
         self.report_text_edit.setPlainText(self.report_text or "")
@@ -1120,40 +1088,9 @@ class MainWindow(QMainWindow):
             try:
                 classifier = TransactionClassifier()
                 stats = classifier.get_classification_statistics(self.df)
-                import json
-                def safe_json_load(val):
-                    if isinstance(val, str):
-                        try:
-                            return json.loads(val.replace("'", '"'))
-                        except Exception:
-                            return val
-                    return val
-                def safe_float(val):
-                    try:
-                        return float(val)
-                    except Exception:
-                        return 0.0
-                def fix_stats(stats):
-                    if not isinstance(stats, dict):
-                        return stats
-                    for k in list(stats.keys()):
-                        v = stats[k]
-                        if isinstance(v, str):
-                            v2 = safe_json_load(v)
-                            stats[k] = v2
-                            v = v2
-                        if isinstance(v, dict):
-                            stats[k] = fix_stats(v)
-                    for key in ['总收入', '总支出', '净收入', '非收支总额']:
-                        if key in stats:
-                            stats[key] = safe_float(stats[key])
-                    return stats
-                stats = fix_stats(stats)
-
-                special = {
-                    '"馒头"支出统计': classifier.get_special_statistics(self.df, '馒头'),
-                    '理财退款统计': classifier.get_finance_refund_statistics(self.df)
-                }
+                stats = parse_stats(stats)
+
+                special = classifier.get_special_report(self.df, '馒头')
                 visualizer = DataVisualizer()
                 self.report_text = visualizer.create_summary_report(stats, special)
                 self.update_statistics_tab()
@@ -1559,14 +1496,14 @@ class MainWindow(QMainWindow):
 
             # 生成分类统计
             try:
-                category_stats = filtered_data.groupby(category_column)['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
+                category_stats = filtered_data.groupby(category_column, observed=True)['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
             except Exception as e:
                 print(f"分类统计失败: {e}")
                 category_stats = pd.DataFrame({'sum': [0], 'count': [0]}, index=['无数据'])
             
             # 生成平台统计
             try:
-                platform_stats = filtered_data.groupby('平台')['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
+                platform_stats = filtered_data.groupby('平台', observed=True)['金额'].agg(['sum', 'count']).sort_values('sum', ascending=False)
             except Exception as e:
                 print(f"平台统计失败: {e}")
                 platform_stats = pd.DataFrame({'sum': [0], 'count': [0]}, index=['无数据'])
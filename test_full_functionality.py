@@ -8,14 +8,18 @@ import sys
 import os
 import pandas as pd
 import numpy as np
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QTimer
-import traceback
-import time
+import pytest
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+@pytest.fixture(autouse=True)
+def _no_draw(monkeypatch):
+    """测试只校验逻辑，跳过画布的实际绘制"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    monkeypatch.setattr(FigureCanvasAgg, 'draw', lambda self: None)
+    monkeypatch.setattr(FigureCanvasAgg, 'draw_idle', lambda self, *args, **kwargs: None)
+
 def create_test_data():
     """创建测试数据"""
     test_data = {
@@ -34,265 +38,175 @@ def create_test_data():
         '交易状态': ['成功'] * 9
     }
     
-    return pd.DataFrame(test_data)
+    # 平台/分类使用categorical（整数编码分组），交易时间直接转为datetime64
+    return pd.DataFrame(test_data).assign(
+        平台=lambda d: d['平台'].astype('category'),
+        调整后分类=lambda d: d['调整后分类'].astype('category'),
+        交易时间=lambda d: pd.to_datetime(d['交易时间'])
+    )
 
-def test_data_processing():
+def test_data_processing(window):
     """测试数据处理功能"""
     print("=== 测试数据处理功能 ===")
-    try:
-        from main_gui import MainWindow
-        app = QApplication([])
-        window = MainWindow()
-        
-        # 创建测试数据
-        test_df = create_test_data()
-        print(f"✓ 测试数据创建成功，形状: {test_df.shape}")
-        
-        # 测试数据清理
-        cleaned_df = window.clean_dataframe(test_df)
-        print(f"✓ 数据清理成功，形状: {cleaned_df.shape}")
-        
-        # 设置数据
-        window.df = cleaned_df
-        window.df_filtered = cleaned_df
-        
-        # 测试安全数据复制
-        safe_data = window.create_safe_data_copy(cleaned_df)
-        print(f"✓ 安全数据复制成功，形状: {safe_data.shape}")
-        
-        # 测试手动重建
-        rebuilt_df = window.manual_rebuild_dataframe(cleaned_df)
-        print(f"✓ 手动重建成功，形状: {rebuilt_df.shape}")
-        
-        # 清理
-        window.close()
-        app.quit()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ 数据处理测试失败: {e}")
-        traceback.print_exc()
-        return False
+    # 创建测试数据
+    test_df = create_test_data()
+    print(f"✓ 测试数据创建成功，形状: {test_df.shape}")
+    
+    # 测试数据清理
+    cleaned_df = window.clean_dataframe(test_df)
+    print(f"✓ 数据清理成功，形状: {cleaned_df.shape}")
+    
+    # 设置数据
+    window.df = cleaned_df
+    window.df_filtered = cleaned_df
+    
+    # 测试安全数据复制
+    safe_data = window.create_safe_data_copy(cleaned_df)
+    print(f"✓ 安全数据复制成功，形状: {safe_data.shape}")
+    
+    # 测试手动重建
+    rebuilt_df = window.manual_rebuild_dataframe(cleaned_df)
+    print(f"✓ 手动重建成功，形状: {rebuilt_df.shape}")
+
+def test_clean_dataframe_recleans(window):
+    """清理结果被就地修改或派生后再次传入，都会重新清理并返回新的DataFrame"""
+    cleaned_df = window.clean_dataframe(create_test_data())
 
-def test_filtering_system():
+    cleaned_df['交易状态'] = cleaned_df['交易状态'].astype(str) + '\x00\r\n'
+    again = window.clean_dataframe(cleaned_df)
+    assert again is not cleaned_df
+    assert not again['交易状态'].str.contains('[\x00\r\n]').any()
+
+    derived = again.copy()
+    derived['交易状态'] = derived['交易状态'].astype(str) + '\x00'
+    assert not window.clean_dataframe(derived)['交易状态'].str.contains('\x00').any()
+    print("✓ 修改后的数据重新清理正常")
+
+def test_filtering_system(window):
     """测试筛选系统"""
     print("\n=== 测试筛选系统 ===")
-    try:
-        from main_gui import MainWindow
-        app = QApplication([])
-        window = MainWindow()
-        
-        # 设置测试数据
-        test_df = create_test_data()
-        window.df = test_df
-        window.df_filtered = test_df
-        
-        # 测试筛选方法
-        print("测试筛选方法...")
-        window.apply_filters_and_refresh()
-        print("✓ 筛选方法执行成功")
-        
-        # 清理
-        window.close()
-        app.quit()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ 筛选系统测试失败: {e}")
-        traceback.print_exc()
-        return False
+    # 设置测试数据
+    test_df = create_test_data()
+    window.df = test_df
+    window.df_filtered = test_df
+    
+    # 测试筛选方法
+    print("测试筛选方法...")
+    window.apply_filters_and_refresh()
+    print("✓ 筛选方法执行成功")
 
-def test_chart_system():
+def test_chart_system(window):
     """测试图表系统"""
     print("\n=== 测试图表系统 ===")
-    try:
-        from main_gui import MainWindow
-        app = QApplication([])
-        window = MainWindow()
-        
-        # 设置测试数据
-        test_df = create_test_data()
-        window.df = test_df
-        window.df_filtered = test_df
-        
-        # 测试图表刷新
-        print("测试图表刷新...")
-        window.refresh_charts()
-        print("✓ 图表刷新成功")
-        
-        # 清理
-        window.close()
-        app.quit()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ 图表系统测试失败: {e}")
-        traceback.print_exc()
-        return False
+    # 设置测试数据
+    test_df = create_test_data()
+    window.df = test_df
+    window.df_filtered = test_df
+    
+    # 测试图表刷新
+    print("测试图表刷新...")
+    window.refresh_charts()
+    print("✓ 图表刷新成功")
 
-def test_calendar_system():
+def test_calendar_system(window):
     """测试日历系统"""
     print("\n=== 测试日历系统 ===")
-    try:
-        from main_gui import MainWindow
-        app = QApplication([])
-        window = MainWindow()
-        
-        # 设置测试数据
-        test_df = create_test_data()
-        window.df = test_df
-        window.df_filtered = test_df
-        
-        # 测试日历刷新
-        print("测试日历刷新...")
-        window.refresh_calendar()
-        print("✓ 日历刷新成功")
-        
-        # 清理
-        window.close()
-        app.quit()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ 日历系统测试失败: {e}")
-        traceback.print_exc()
-        return False
+    # 设置测试数据
+    test_df = create_test_data()
+    window.df = test_df
+    window.df_filtered = test_df
+    
+    # 测试日历刷新
+    print("测试日历刷新...")
+    window.refresh_calendar()
+    print("✓ 日历刷新成功")
 
-def test_stress_conditions():
+def test_stress_conditions(window):
     """测试压力条件"""
     print("\n=== 测试压力条件 ===")
-    try:
-        from main_gui import MainWindow
-        app = QApplication([])
-        window = MainWindow()
-        
-        # 创建大量测试数据
-        large_data = []
-        for i in range(1000):
-            large_data.append({
-                '交易时间': f'2025-01-{(i%30)+1:02d} 10:00:00',
-                '金额': (i % 1000) + 1,
-                '调整后分类': f'支出-类别{i%10}',
-                '平台': ['微信', '支付宝', '银行'][i%3],
-                '交易状态': '成功'
-            })
-        
-        large_df = pd.DataFrame(large_data)
-        print(f"✓ 大量测试数据创建成功，形状: {large_df.shape}")
-        
-        # 测试大数据处理
-        print("测试大数据处理...")
-        cleaned_large_df = window.clean_dataframe(large_df)
-        print(f"✓ 大数据清理成功，形状: {cleaned_large_df.shape}")
-        
-        # 测试大数据筛选
-        window.df = cleaned_large_df
-        window.df_filtered = cleaned_large_df
-        
-        print("测试大数据筛选...")
-        window.apply_filters_and_refresh()
-        print("✓ 大数据筛选成功")
-        
-        # 清理
-        window.close()
-        app.quit()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ 压力条件测试失败: {e}")
-        traceback.print_exc()
-        return False
+    # 创建大量测试数据：按列生成数组，每列独立存放，不经过逐行字典
+    n = 1000
+    i = np.arange(n)
+    times = np.datetime64('2025-01-01T10:00:00', 'ns') + (i % 30).astype('timedelta64[D]')
+    amt = i % 1000 + 1
+    cats = pd.Categorical.from_codes(i % 10, [f'支出-类别{k}' for k in range(10)])
+    platforms = pd.Categorical.from_codes(i % 3, ['微信', '支付宝', '银行'])
+    status = np.full(n, '成功', dtype=object)
+    
+    large_df = pd.DataFrame({
+        '交易时间': times,
+        '金额': amt,
+        '调整后分类': cats,
+        '平台': platforms,
+        '交易状态': status,
+    }, copy=False)
+    print(f"✓ 大量测试数据创建成功，形状: {large_df.shape}")
+    
+    # 测试大数据处理
+    print("测试大数据处理...")
+    cleaned_large_df = window.clean_dataframe(large_df)
+    print(f"✓ 大数据清理成功，形状: {cleaned_large_df.shape}")
+    
+    # 测试大数据筛选
+    window.df = cleaned_large_df
+    window.df_filtered = cleaned_large_df
+    
+    print("测试大数据筛选...")
+    window.apply_filters_and_refresh()
+    print("✓ 大数据筛选成功")
 
-def test_error_recovery():
+def test_error_recovery(window):
     """测试错误恢复"""
     print("\n=== 测试错误恢复 ===")
-    try:
-        from main_gui import MainWindow
-        app = QApplication([])
-        window = MainWindow()
-        
-        # 创建有问题的测试数据
-        problematic_data = {
-            '交易时间': ['2025-01-01', 'invalid_date', '2025-01-03'],
-            '金额': [100, 'invalid_amount', 300],
-            '调整后分类': ['支出-餐饮', None, '支出-交通'],
-            '平台': ['微信', '', '支付宝'],
-            '交易状态': ['成功', '成功', '成功']
-        }
-        
-        problematic_df = pd.DataFrame(problematic_data)
-        print(f"✓ 问题测试数据创建成功，形状: {problematic_df.shape}")
-        
-        # 测试问题数据处理
-        print("测试问题数据处理...")
-        cleaned_problematic_df = window.clean_dataframe(problematic_df)
-        print(f"✓ 问题数据清理成功，形状: {cleaned_problematic_df.shape}")
-        
-        # 测试问题数据筛选
-        window.df = cleaned_problematic_df
-        window.df_filtered = cleaned_problematic_df
-        
-        print("测试问题数据筛选...")
-        window.apply_filters_and_refresh()
-        print("✓ 问题数据筛选成功")
-        
-        # 清理
-        window.close()
-        app.quit()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ 错误恢复测试失败: {e}")
-        traceback.print_exc()
-        return False
-
-def main():
-    """主测试函数"""
-    print("开始全面功能测试...")
-    print("=" * 60)
+    # 创建有问题的测试数据
+    # 非法日期/金额在构造时就转成NaT/NaN，列保持datetime64/float64/category类型
+    problematic_df = pd.DataFrame({
+        '交易时间': pd.to_datetime(['2025-01-01', 'invalid_date', '2025-01-03'], errors='coerce'),
+        '金额': pd.to_numeric(pd.Series([100, 'invalid_amount', 300]), errors='coerce'),
+        '调整后分类': pd.Categorical(['支出-餐饮', None, '支出-交通']),
+        '平台': pd.Categorical(['微信', '', '支付宝']),
+        '交易状态': ['成功', '成功', '成功']
+    })
+    print(f"✓ 问题测试数据创建成功，形状: {problematic_df.shape}")
     
-    tests = [
-        ("数据处理功能", test_data_processing),
-        ("筛选系统", test_filtering_system),
-        ("图表系统", test_chart_system),
-        ("日历系统", test_calendar_system),
-        ("压力条件", test_stress_conditions),
-        ("错误恢复", test_error_recovery)
-    ]
+    # 测试问题数据处理
+    print("测试问题数据处理...")
+    cleaned_problematic_df = window.clean_dataframe(problematic_df)
+    print(f"✓ 问题数据清理成功，形状: {cleaned_problematic_df.shape}")
     
-    passed = 0
-    total = len(tests)
+    # 测试问题数据筛选
+    window.df = cleaned_problematic_df
+    window.df_filtered = cleaned_problematic_df
     
-    for test_name, test_func in tests:
-        try:
-            print(f"\n开始测试: {test_name}")
-            if test_func():
-                passed += 1
-                print(f"✓ {test_name} 测试通过")
-            else:
-                print(f"✗ {test_name} 测试失败")
-        except Exception as e:
-            print(f"✗ {test_name} 测试异常: {e}")
-            traceback.print_exc()
-        
-        print("-" * 40)
-        time.sleep(1)  # 给系统一些时间
-    
-    print(f"\n测试结果: {passed}/{total} 通过")
-    
-    if passed == total:
-        print("🎉 所有测试通过！程序功能完整，应该可以正常运行。")
-        return True
-    else:
-        print("⚠️  部分测试失败，程序可能仍有问题。")
-        return False
+    print("测试问题数据筛选...")
+    window.apply_filters_and_refresh()
+    print("✓ 问题数据筛选成功")
+
+def test_error_recovery_raw_strings(window):
+    """非法日期/金额以原始字符串（object列）直接传入clean_dataframe"""
+    problematic_df = pd.DataFrame({
+        '交易时间': ['2025-01-01', 'invalid_date', '2025-01-03'],
+        '金额': [100, 'invalid_amount', 300],
+        '调整后分类': ['支出-餐饮', None, '支出-交通'],
+        '平台': ['微信', '', '支付宝'],
+        '交易状态': ['成功', '成功', '成功']
+    })
+    assert problematic_df['交易时间'].dtype == object
+    assert problematic_df['金额'].dtype == object
+
+    cleaned_problematic_df = window.clean_dataframe(problematic_df)
+    assert len(cleaned_problematic_df) == len(problematic_df)
+    # 非法日期转为NaT，非法金额转为0
+    assert pd.isna(cleaned_problematic_df['交易时间'].iloc[1])
+    assert cleaned_problematic_df['金额'].tolist() == [100.0, 0.0, 300.0]
+    print(f"✓ 原始字符串问题数据清理成功，形状: {cleaned_problematic_df.shape}")
+
+    window.df = cleaned_problematic_df
+    window.df_filtered = cleaned_problematic_df
+    window.apply_filters_and_refresh()
+    window.refresh_charts()
+    window.refresh_calendar()
+    print("✓ 原始字符串问题数据筛选与刷新成功")
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,166 @@
+"""
+交易分类器测试
+用固定的配置、用户规则和交易数据锁定整表分类与逐条分类的结果
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from transaction_classifier import TransactionClassifier
+
+CONFIG = {
+    "分类规则": {
+        "支出": {"餐饮": ["餐厅", "馒头"], "购物": ["淘宝"]},
+        "收入": {"红包": ["红包"]},
+        "非收支": ["余额宝", "转账"],
+    },
+    "系统设置": {"金额模糊化": {"区间设置": [0, 10, 20, 50, 100], "超出最大区间的标识": "100+"}},
+}
+
+USER_RULES = {
+    # 按交易对方索引的通配键
+    ".*_余额宝_.*": [{"desc_regex": "收益", "category": "收入-理财收益"}, {"category": "非收支-余额宝"}],
+    # 普通键（手动记忆的指纹）
+    "10-20_张三_12": [{"desc_regex": "午饭", "category": "支出-餐饮-午饭"}],
+    "10-20_张三_*": [{"category": "支出-人情"}],
+    # 规则为空的普通键排在通配键之前：命中后不再使用后面的通配键
+    "0-10_李四_9": [],
+    ".*_李四_.*": [{"category": "支出-李四通配"}],
+    # 其他正则键
+    "50-100_王五.*_20": [{"category": "支出-王五"}],
+}
+
+COLUMNS = ['交易时间', '交易对方', '商品说明', '金额', '收/支', '交易分类', '交易状态', '跨平台转账']
+ROWS = [
+    ('2025-01-01 12:00:00', '张三', '午饭', 15, '支出', '', '成功', False),
+    ('2025-01-01 12:30:00', '张三', '晚饭', 15, '支出', '', '成功', False),
+    ('2025-01-01 18:00:00', '张三', 'x', 15, '支出', '', '成功', False),
+    ('2025-01-02 09:00:00', '李四', '餐厅吃饭', 5, '支出', '', '成功', False),
+    ('2025-01-02 10:00:00', '李四', '杂物', 5, '支出', '', '成功', False),
+    ('2025-01-02 11:00:00', '余额宝', '收益发放', 0.5, '收入', '', '成功', False),
+    ('2025-01-03 20:00:00', '王五超市', '淘宝', 60, '支出', '', '成功', False),
+    ('2025-01-01 12:00:00', '张三', '午饭', 15, '支出', '', '退款成功', False),
+    ('2025-01-04 08:00:00', '赵六', '红包', 30, '收入', '', '成功', True),
+    ('2025-01-04 09:00:00', '孙七', '馒头', np.nan, '支出', '', '成功', False),
+    ('2025-01-01 12:00:00', '张三', '午饭', 0, '支出', '', '成功', False),
+    ('2025-01-04 10:00:00', '周八', '', 'abc', '收入', '红包', '成功', False),
+    ('2025-01-04 11:00:00', '吴九', '随便', 8, '不计收支', '', '成功', False),
+    ('2025-01-04 12:00:00', '郑十', '转账给朋友', 8, '支出', '', '成功', False),
+    ('bad', '张三', 'x', 15, '支出', '', '成功', False),
+]
+EXPECTED = [
+    ('支出-餐饮-午饭', 'user_rules'),
+    ('支出-餐饮-午饭', 'user_rules'),    # 命中键但商品说明不匹配，取第一条规则
+    ('支出-人情', 'user_rules'),         # 通用时间键
+    ('支出-餐饮', 'config'),             # 规则为空的普通键，回退config
+    ('支出-李四通配', 'user_rules'),
+    ('收入-理财收益', 'user_rules'),
+    ('支出-王五', 'user_rules'),
+    ('未达到分类要求', 'status_filter'),
+    ('非收支', 'config'),                # 跨平台转账优先
+    ('支出-餐饮', 'config'),             # 金额为NaN
+    ('支出-其他', 'config'),             # 金额为0时金额部分为空
+    ('收入-红包', 'config'),             # 金额无效，不参与user_rules
+    ('未分类', 'config'),
+    ('非收支', 'config'),
+    ('支出-人情', 'user_rules'),         # 时间无效
+]
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(CONFIG, ensure_ascii=False), encoding="utf-8")
+    rules_file = tmp_path / "user_rules.json"
+    rules_file.write_text(json.dumps(USER_RULES, ensure_ascii=False), encoding="utf-8")
+    return TransactionClassifier(str(config_file), str(rules_file))
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(ROWS, columns=COLUMNS)
+
+
+def test_classify_all_transactions(classifier, frame):
+    result = classifier.classify_all_transactions(frame)
+    assert list(zip(result['分类'].astype(object), result['分类来源'].astype(object))) == EXPECTED
+    assert result['调整后分类'].tolist() == [cat for cat, _ in EXPECTED]
+    assert result['调整后子分类'].tolist() == [cat.split('-')[-1] for cat, _ in EXPECTED]
+
+
+def test_classify_numeric_amounts(classifier, frame):
+    """金额为数值列时走整列区间查找，结果相同"""
+    numeric = frame.drop(index=11).reset_index(drop=True)
+    numeric['金额'] = numeric['金额'].astype(float)
+    result = classifier.classify_all_transactions(numeric)
+    expected = EXPECTED[:11] + EXPECTED[12:]
+    assert list(zip(result['分类'].astype(object), result['分类来源'].astype(object))) == expected
+
+
+def test_classify_transaction_matches_batch(classifier, frame):
+    assert [classifier.classify_transaction(frame.iloc[i]) for i in range(len(frame))] == EXPECTED
+
+
+def test_incremental_keeps_manual_adjustment(classifier, frame):
+    """已分类的数据再追加新账单，只分类新行，手动调整的分类保留"""
+    first = classifier.classify_all_transactions(frame.iloc[:5])
+    first.loc[first.index[0], '调整后分类'] = '手动-调整'
+    combined = pd.concat([first, frame.iloc[5:]], ignore_index=True)
+
+    result = classifier.classify_all_transactions(combined)
+    assert list(zip(result['分类'].astype(object), result['分类来源'].astype(object))) == EXPECTED
+    assert result['调整后分类'].iloc[0] == '手动-调整'
+    assert result['调整后分类'].iloc[1:].tolist() == [cat for cat, _ in EXPECTED[1:]]
+    assert classifier.classify_all_transactions(result) is result
+
+
+def test_fingerprints_match_fingerprint(classifier, frame):
+    expected = [classifier._fingerprint(frame.iloc[i]) for i in range(len(frame))]
+    assert classifier._fingerprints(frame).tolist() == expected
+    assert expected[5] == '0-10_余额宝_*'
+
+
+def test_fingerprints_nullable_amount(classifier):
+    """可空整数金额列中的pd.NA，整表与逐行指纹都按金额0计算区间"""
+    frame = pd.DataFrame({
+        '交易对方': ['张三', '李四'],
+        '金额': pd.array([pd.NA, 15], dtype='Int64'),
+        '交易时间': ['2025-01-01 12:00:00'] * 2,
+    })
+    expected = [classifier._fingerprint(frame.iloc[i]) for i in range(len(frame))]
+    assert classifier._fingerprints(frame).tolist() == expected
+    assert expected == ['0-10_张三_12', '10-20_李四_12']
+
+
+def test_statistics_omit_unobserved_categories(classifier, frame):
+    """Categorical分类列筛选后统计，只包含子集中出现的分类"""
+    result = classifier.classify_all_transactions(frame)
+    subset = result[result['分类来源'] == 'user_rules'].drop(columns=['调整后分类'])
+    stats = classifier.get_classification_statistics(subset)
+    counts = stats['分类统计']['数量']
+    assert 0 not in counts.values()
+    assert set(counts) == set(stats['分类统计']['金额']) == set(subset['分类'].astype(object))
+
+
+def test_missing_and_zero_text_cells(tmp_path):
+    """文本列为NaN、0、pd.NA时，整表与逐行分类的文本规范化一致"""
+    config = dict(CONFIG, 分类规则={"支出": {"食": ["an"], "零": ["0"]}})
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+    classifier = TransactionClassifier(str(config_file), str(tmp_path / "user_rules.json"))
+    frame = pd.DataFrame({
+        '交易对方': ['甲', '乙', '丙'],
+        '商品说明': [np.nan, 0, pd.NA],
+        '金额': [5, 5, 5],
+        '收/支': ['支出'] * 3,
+        '交易状态': ['成功'] * 3,
+    })
+
+    result = classifier.classify_all_transactions(frame)
+    rows = [classifier.classify_transaction(frame.iloc[i]) for i in range(len(frame))]
+    assert list(zip(result['分类'].astype(object), result['分类来源'].astype(object))) == rows
+    # NaN按'nan'参与匹配，0与空值相同
+    assert [cat for cat, _ in rows] == ['支出-食', '支出-其他', '支出-其他']
@@ -0,0 +1,156 @@
+"""
+用户规则持久化测试
+验证追加日志、加载时回放、合并写入以及内容未变化时跳过写入
+"""
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import transaction_classifier
+from transaction_classifier import TransactionClassifier
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    return str(tmp_path / "user_rules.json")
+
+
+@pytest.fixture
+def make_classifier(rules_file):
+    """在临时目录中创建分类器，测试结束时取消尚未触发的延迟合并"""
+    created = []
+
+    def make():
+        classifier = TransactionClassifier(CONFIG_FILE, rules_file)
+        created.append(classifier)
+        return classifier
+
+    yield make
+    for classifier in created:
+        if classifier._flush_timer is not None:
+            classifier._flush_timer.cancel()
+
+
+def _row(party='测试商家', amount=12.34):
+    return pd.Series({'交易对方': party, '商品说明': '测试商品', '金额': amount,
+                      '交易时间': '2025-01-01 10:00:00'})
+
+
+def test_add_appends_log_and_replays_on_load(make_classifier, rules_file):
+    """新增规则先写入.jsonl日志，未合并时新实例加载也能读到"""
+    classifier = make_classifier()
+    classifier.add_user_classification(_row(), '自定义-测试分类')
+
+    log_file = os.path.splitext(rules_file)[0] + '.jsonl'
+    assert os.path.exists(log_file)
+    assert not os.path.exists(rules_file)
+
+    fingerprint = classifier._fingerprint(_row())
+    reloaded = make_classifier()
+    assert reloaded.user_classifications[fingerprint] == '自定义-测试分类'
+
+
+def test_replay_skips_truncated_line(make_classifier, rules_file):
+    """写入中断留下的半行被跳过，其余规则照常回放"""
+    log_file = os.path.splitext(rules_file)[0] + '.jsonl'
+    with open(log_file, 'wb') as f:
+        f.write('{"fp": "a", "cls": "甲"}\n{"fp": "b", "c'.encode('utf-8'))
+    classifier = make_classifier()
+    assert classifier.user_classifications == {'a': '甲'}
+
+
+def test_save_merges_log(make_classifier, rules_file):
+    """合并写入后日志被清空，user_rules.json包含新规则"""
+    classifier = make_classifier()
+    classifier.add_user_classifications(pd.DataFrame([_row('商家甲'), _row('商家乙')]), '自定义-批量')
+    classifier.save_user_rules()
+
+    assert os.path.getsize(classifier._rules_log_file) == 0
+    reloaded = make_classifier()
+    assert reloaded.user_classifications == classifier.user_classifications
+    assert len(reloaded.user_classifications) == 2
+
+
+def test_save_skips_unchanged_content(make_classifier, rules_file, capsys):
+    """内容与上次写入相同时不重写文件"""
+    classifier = make_classifier()
+    classifier.add_user_classification(_row(), '自定义-测试分类', persist=False)
+    classifier.save_user_rules()
+    assert "用户规则已保存" in capsys.readouterr().out
+    mtime = os.stat(rules_file).st_mtime_ns
+
+    classifier.save_user_rules()
+    make_classifier().save_user_rules()
+    assert capsys.readouterr().out == ""
+    assert os.stat(rules_file).st_mtime_ns == mtime
+
+
+def test_save_snapshot_not_mutated_by_concurrent_edit(make_classifier, monkeypatch):
+    """合并写入序列化期间另一线程新增规则，被序列化的字典不受影响，新规则在下次写入"""
+    classifier = make_classifier()
+    real_dumps = transaction_classifier.json_dumps
+    sizes, editors = [], []
+
+    def dumps_with_concurrent_edit(obj, indent=False):
+        before = len(obj)
+        editor = threading.Thread(target=classifier.add_user_classification,
+                                  args=(_row('并发商家'), '自定义-并发'), kwargs={'persist': False})
+        editor.start()
+        editor.join(0.2)
+        editors.append(editor)
+        sizes.append((before, len(obj)))
+        return real_dumps(obj, indent)
+
+    monkeypatch.setattr(transaction_classifier, "json_dumps", dumps_with_concurrent_edit)
+    classifier.save_user_rules()
+    editors[0].join()
+    monkeypatch.setattr(transaction_classifier, "json_dumps", real_dumps)
+
+    assert sizes == [(0, 0)]
+    classifier.save_user_rules()
+    assert len(make_classifier().user_classifications) == 1
+
+
+def test_save_keeps_other_instances_log_entries(make_classifier):
+    """合并只去掉已写入user_rules.json的规则，另一实例追加的规则留在日志中"""
+    first, second = make_classifier(), make_classifier()
+    first.add_user_classification(_row('商家甲'), '自定义-甲')
+    first.add_user_classification(_row('商家甲'), '自定义-甲2')
+    second.add_user_classification(_row('商家乙'), '自定义-乙')
+    first.save_user_rules()
+
+    # 合并后另一实例继续追加，写入替换后的日志
+    second.add_user_classification(_row('商家丙'), '自定义-丙')
+    with open(first._rules_log_file, 'rb') as f:
+        assert len(f.read().splitlines()) == 2
+    reloaded = make_classifier()
+    assert sorted(reloaded.user_classifications.values()) == ['自定义-丙', '自定义-乙', '自定义-甲2']
+
+
+def test_add_updates_index_incrementally(make_classifier, monkeypatch):
+    """新增规则只更新相关键的索引，结果与整体重建索引相同"""
+    classifier = make_classifier()
+    classifier.add_user_classification(_row('商家甲'), [{'category': '支出-甲'}], persist=False)
+
+    def rebuild():
+        raise AssertionError("新增规则不应重建整个索引")
+
+    monkeypatch.setattr(classifier, '_index_user_rules', rebuild)
+    classifier.add_user_classification(_row('商家乙'), [{'category': '支出-乙'}], persist=False)
+    classifier.add_user_classification(_row('a.b'), [{'category': '支出-正则'}], persist=False)
+    classifier.add_user_classification(_row('商家甲'), [{'desc_regex': '测试', 'category': '支出-甲2'}],
+                                       persist=False)
+    assert classifier.classify_transaction(_row('商家甲')) == ('支出-甲2', 'user_rules')
+    assert classifier.classify_transaction(_row('a.b')) == ('支出-正则', 'user_rules')
+    incremental = (classifier._literal_rule_keys, classifier._party_rule_keys,
+                   classifier._other_rule_keys, classifier._desc_rules)
+
+    monkeypatch.undo()
+    classifier._index_user_rules()
+    assert (classifier._literal_rule_keys, classifier._party_rule_keys,
+            classifier._other_rule_keys, classifier._desc_rules) == incremental
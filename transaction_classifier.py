@@ -4,10 +4,43 @@
 """
 
 import pandas as pd
-import json
+import numpy as np
+import hashlib
+import logging
 from typing import Dict, Optional
 import os
 import re
+import threading
+import heapq
+from bisect import bisect_right
+from datetime import datetime
+
+from utils import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+# 交易状态包含这些关键词时不参与分类
+FAIL_STATUS_KEYWORDS = ['对方已退还', '已全额退款', '还款失败', '失败', '退款', '退还']
+_FAIL_STATUS_RE = re.compile('|'.join(map(re.escape, FAIL_STATUS_KEYWORDS)))
+
+# 理财/退款统计：交易分类或商品说明包含任一关键词
+_FINANCE_REFUND_QUERY = (('交易分类', '商品说明'), ['退款', '理财', '基金', '余额宝'], None)
+
+# 通用商户的指纹不区分小时
+_GENERIC_PARTIES = frozenset(['拼多多平台商户', '抖音电商商家', '淘宝（中国）软件有限公司', '芝麻信用', '多多有礼',
+                              '借呗', '余额宝'])
+
+# 新增用户规则后延迟合并写入user_rules.json的秒数
+_RULES_FLUSH_DELAY = 2.0
+
+# 匹配结果缓存的最大条目数，超出后整体清空
+_MATCH_CACHE_LIMIT = 65536
+
+# 形如 .*_交易对方_.* 的user_rules键，交易对方部分不含正则元字符和下划线
+_PARTY_WILDCARD_KEY_RE = re.compile(r'\.\*_([^_.*?+()\[\]{}|^$\\]+)_\.\*')
+
+# 不含这些字符的user_rules键只能匹配与自身相同的文本，按字典直接查找
+_REGEX_META_RE = re.compile(r'[.^$*+?{}\[\]\\|()]')
 
 
 class TransactionClassifier:
@@ -17,136 +50,368 @@ class TransactionClassifier:
         """初始化分类器，加载分类规则与用户手动分类缓存
         - user_rules.json 用于保存用户记忆的分类规则（可选持久化）
         """
-        with open(config_file, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
-        self.classification_rules = self.config.get('分类规则', {})
+        with open(config_file, 'rb') as f:
+            self._load_config(json_loads(f.read()))
         self.user_rules_file = user_rules_file
+        # 新增的规则先追加到 .jsonl 日志，延迟合并进 user_rules.json
+        self._rules_log_file = os.path.splitext(user_rules_file)[0] + '.jsonl'
+        self._rules_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._compiled: Dict[str, re.Pattern] = {}
+        # 上次写入（或读入）的user_rules.json内容摘要，内容未变化时跳过写入
+        self._saved_digest: Optional[bytes] = None
         self.user_classifications: Dict[str, str] = self._load_user_rules()
+        self._index_user_rules()
     
+    def _load_config(self, config: Dict):
+        """应用配置：编译关键词规则并缓存金额模糊化设置"""
+        self.config = config
+        self.classification_rules = self.config.get('分类规则', {})
+        self._build_keyword_matchers()
+        # 金额区间边界及对应标签，最后一个标签用于超出区间的金额
+        fuzzy_config = self.config.get('系统设置', {}).get('金额模糊化', {})
+        intervals = fuzzy_config.get('区间设置', [0, 10, 20, 50, 100, 300, 500])
+        self._interval_bounds = [float(x) for x in intervals]
+        self._interval_labels = [f"{a}-{b}" for a, b in zip(intervals[:-1], intervals[1:])]
+        self._interval_labels.append(fuzzy_config.get('超出最大区间的标识', '500+'))
+        # 整列查找用的数组形式
+        self._interval_arr = np.asarray(self._interval_bounds, dtype=np.float64)
+        self._interval_label_arr = np.array(self._interval_labels, dtype=object)
+        self._ignore_amount = fuzzy_config.get('忽略金额', False)
+
     def _load_user_rules(self) -> Dict[str, str]:
+        data: Dict[str, str] = {}
         if os.path.exists(self.user_rules_file):
             try:
-                with open(self.user_rules_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        return data
+                with open(self.user_rules_file, 'rb') as f:
+                    loaded = json_loads(f.read())
+                    if isinstance(loaded, dict):
+                        data = loaded
+                        self._saved_digest = self._digest(json_dumps(data, indent=True))
             except Exception:
                 pass
-        return {}
+        # 回放追加日志中尚未合并的规则
+        if os.path.exists(self._rules_log_file):
+            try:
+                with open(self._rules_log_file, 'rb') as f:
+                    for line in f:
+                        try:
+                            entry = json_loads(line)
+                        except ValueError:
+                            continue  # 跳过空行或写入中断的半行
+                        data[entry['fp']] = entry['cls']
+            except Exception as e:
+                print(f"读取用户规则日志失败：{str(e)}")
+        return data
+
+    def _append_rule_log(self, entries):
+        """把新规则 [(指纹, 分类)] 追加到日志，并重新计时延迟合并
+
+        每次追加都重新打开日志，不长期占用文件：其他实例合并时替换了日志，
+        之后的追加也会写入新文件。
+        """
+        with self._rules_lock:
+            try:
+                dir_path = os.path.dirname(self._rules_log_file)
+                if dir_path and not os.path.exists(dir_path):
+                    os.makedirs(dir_path, exist_ok=True)
+                with open(self._rules_log_file, 'ab') as f:
+                    f.write(b''.join(json_dumps({'fp': fp, 'cls': cls}) + b'\n' for fp, cls in entries))
+            except Exception as e:
+                print(f"记录用户规则失败：{str(e)}")
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(_RULES_FLUSH_DELAY, self.save_user_rules)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _index_user_rules(self):
+        """为user_rules的通配键建立索引
+
+        .*_交易对方_.* 形式的键按交易对方分组，不含正则元字符的普通键（如手动记忆的指纹）
+        放入字典按原文查找，其余键保留在顺序列表中；
+        所有键预先编译，条目带原始顺序号，匹配时仍按原顺序取第一个命中的键。
+        各规则的desc_regex也在此预编译到 _desc_rules，原规则字典保持不变便于保存。
+        编译结果经 _get_re 缓存；新增规则时由 _reindex_rules 只索引新的键。
+        """
+        self._party_rule_keys: Dict[str, list] = {}
+        self._other_rule_keys: list = []
+        self._literal_rule_keys: Dict[str, int] = {}
+        self._user_rule_cache: Dict[tuple, Optional[tuple]] = {}
+        self._rule_key_cache: Dict[tuple, Optional[str]] = {}
+        self._desc_rules: Dict[str, list] = {}
+        self._next_rule_order = 0
+        for key in self.user_classifications:
+            self._index_rule_key(key)
+
+    def _index_rule_key(self, key: str):
+        """把一个user_rules键按下一个顺序号加入索引，并预编译其desc_regex"""
+        order = self._next_rule_order
+        self._next_rule_order += 1
+        self._desc_rules[key] = self._compile_desc_rules(self.user_classifications[key])
+        if not _REGEX_META_RE.search(key):
+            self._literal_rule_keys[key] = order
+            return
+        try:
+            compiled = self._get_re(key.replace('*', '.*'))
+        except re.error:
+            return
+        entry = (order, key, compiled)
+        m = _PARTY_WILDCARD_KEY_RE.fullmatch(key)
+        if m:
+            self._party_rule_keys.setdefault(m.group(1), []).append(entry)
+        else:
+            self._other_rule_keys.append(entry)
+
+    def _reindex_rules(self, keys):
+        """新增或修改规则后只更新这些键的索引，不重建整个索引
+
+        已有的键在字典中的位置不变，只重新编译其规则；新键追加在末尾，顺序号最大。
+        匹配结果可能变化，清空匹配缓存。
+        """
+        for key in dict.fromkeys(keys):
+            if key in self._desc_rules:
+                self._desc_rules[key] = self._compile_desc_rules(self.user_classifications[key])
+            else:
+                self._index_rule_key(key)
+        self._user_rule_cache.clear()
+        self._rule_key_cache.clear()
+
+    def _get_re(self, pattern: str) -> re.Pattern:
+        """编译正则并缓存，无效正则照常抛出re.error"""
+        compiled = self._compiled.get(pattern)
+        if compiled is None:
+            compiled = self._compiled[pattern] = re.compile(pattern)
+        return compiled
+
+    def _compile_desc_rules(self, rules) -> list:
+        """把一组规则编译为 [(desc正则, 分类)]，无效的规则编译为 (None, None)"""
+        compiled = []
+        for rule in rules if isinstance(rules, list) else []:
+            desc_re = None
+            try:
+                pattern = rule.get("desc_regex", "")
+                if pattern:
+                    desc_re = self._get_re(pattern)
+            except Exception as e:
+                logger.warning("user_rules正则异常: %s", e)
+            compiled.append((desc_re, rule.get("category") if desc_re is not None else None))
+        return compiled
+
+    def _find_wildcard_key(self, party: str, test_key: str) -> Optional[str]:
+        """按原顺序返回第一个能匹配test_key的user_rules键"""
+        if '_' in party:
+            # 交易对方本身含下划线时无法按对方定位，退回检查全部键
+            candidates = heapq.merge(*self._party_rule_keys.values(), self._other_rule_keys)
+        else:
+            candidates = heapq.merge(self._party_rule_keys.get(party, []), self._other_rule_keys)
+        # 与test_key相同的普通键只需比较顺序号：排在它之前的正则键优先
+        literal_order = self._literal_rule_keys.get(test_key)
+        for order, key, compiled in candidates:
+            if literal_order is not None and order > literal_order:
+                return test_key
+            if compiled.fullmatch(test_key):
+                return key
+        return test_key if literal_order is not None else None
+
+    @staticmethod
+    def _digest(content: bytes) -> bytes:
+        return hashlib.blake2b(content, digest_size=16).digest()
 
     def save_user_rules(self):
-        try:
-            # 只有内容有变化时才保存，减少磁盘写入和控制台输出
-            if os.path.exists(self.user_rules_file):
-                with open(self.user_rules_file, 'r', encoding='utf-8') as f:
-                    old_data = json.load(f)
-                if old_data == self.user_classifications:
-                    return  # 无变化则不保存
-            dir_path = os.path.dirname(self.user_rules_file)
-            if dir_path and not os.path.exists(dir_path):
-                os.makedirs(dir_path, exist_ok=True)
-            with open(self.user_rules_file, 'w', encoding='utf-8') as f:
-                json.dump(self.user_classifications, f, ensure_ascii=False, indent=2)
-            # 控制台输出只保留一次
-            print(f"用户规则已保存到 {self.user_rules_file}，共 {len(self.user_classifications)} 条")
-        except Exception as e:
-            print(f"保存用户规则失败：{str(e)}")
+        """完整写入user_rules.json（先写临时文件再替换），合并后压缩追加日志
+
+        内容与上次写入时相同则不重写文件。
+        """
+        with self._rules_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            try:
+                dir_path = os.path.dirname(self.user_rules_file)
+                if dir_path and not os.path.exists(dir_path):
+                    os.makedirs(dir_path, exist_ok=True)
+                # 持锁取快照后序列化；规则的修改也在该锁内进行
+                snapshot = dict(self.user_classifications)
+                content = json_dumps(snapshot, indent=True)
+                digest = self._digest(content)
+                changed = digest != self._saved_digest or not os.path.exists(self.user_rules_file)
+                if changed:
+                    tmp_file = self.user_rules_file + '.tmp'
+                    with open(tmp_file, 'wb') as f:
+                        f.write(content)
+                    os.replace(tmp_file, self.user_rules_file)
+                    self._saved_digest = digest
+                self._compact_rule_log(snapshot)
+                # 控制台输出只保留一次
+                if changed:
+                    print(f"用户规则已保存到 {self.user_rules_file}，共 {len(snapshot)} 条")
+            except Exception as e:
+                print(f"保存用户规则失败：{str(e)}")
     
-    def _text(self, value) -> str:
-        return str(value or '').lower()
+    def _compact_rule_log(self, snapshot: Dict):
+        """合并写入后重写追加日志，只保留快照中还没有的规则（如其他实例追加的）
+
+        每个指纹只看日志中最后一条；与快照一致的丢弃。先写临时文件再替换，
+        不删除日志，其他实例打开日志时也不会出错。
+        """
+        if not os.path.exists(self._rules_log_file):
+            return
+        latest: Dict[str, bytes] = {}
+        with open(self._rules_log_file, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json_loads(line)
+                except ValueError:
+                    continue  # 跳过空行或写入中断的半行
+                latest.pop(entry['fp'], None)
+                if snapshot.get(entry['fp']) != entry['cls']:
+                    latest[entry['fp']] = line.rstrip(b'\n') + b'\n'
+        tmp_file = self._rules_log_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(b''.join(latest.values()))
+        os.replace(tmp_file, self._rules_log_file)
+
+    @staticmethod
+    def _text(value) -> str:
+        """分类用的小写文本，逐行与整表分类共用：None/0/''为''，NaN为'nan'"""
+        try:
+            return str(value or '').lower()
+        except TypeError:
+            # pd.NA 的真值不确定，按空值处理
+            return ''
 
     def classify_transaction(self, row: pd.Series) -> tuple:
         # 新增：失败状态直接返回特殊分类
-        fail_status_keywords = ['对方已退还', '已全额退款', '还款失败', '失败', '退款', '退还']
         status = str(row.get('交易状态', '') or '').strip()
-        if any(kw in status for kw in fail_status_keywords):
+        if _FAIL_STATUS_RE.search(status):
             return '未达到分类要求', 'status_filter'
+        matched = self._match_user_rules(row)
+        if matched is not None:
+            return matched
+        return self._classify_by_config(row)
+
+    @staticmethod
+    def _parse_hour(value):
+        """提取交易时间的小时；已是时间对象时直接取，无法解析时返回''"""
+        if isinstance(value, datetime):
+            return value.hour
+        try:
+            return pd.to_datetime(str(value or '')).hour
+        except Exception:
+            return ''
+
+    def _parse_hours(self, values: pd.Series) -> np.ndarray:
+        """整列提取小时，结果与逐条 _parse_hour 一致，每个不同的值只解析一次"""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            hours = np.full(len(values), np.nan, dtype=object)
+            valid = values.notna().to_numpy()
+            hours[valid] = values[valid].dt.hour.to_numpy().tolist()
+            return hours
+        return self._map_unique(values, self._parse_hour)
+
+    @staticmethod
+    def _map_unique(values: pd.Series, func) -> np.ndarray:
+        """对每个不同的值只调用一次func；None/NaN等空值行为可能不同，逐个调用"""
+        codes, uniques = pd.factorize(values)
+        result = np.array([func(u) for u in uniques] + [None], dtype=object)[codes]
+        for pos in np.flatnonzero(codes == -1):
+            result[pos] = func(values.iat[pos])
+        return result
+
+    def _match_user_rules(self, row: pd.Series, hour=None, amount_part: Optional[str] = None) -> Optional[tuple]:
+        """按user_rules匹配单条交易，未命中返回None
+
+        hour、amount_part 为批量预先计算好的小时和金额区间，未传入时从该行计算。
+        """
         try:
-            amount = float(row.get('金额', 0) or 0)
-            party = str(row.get('交易对方', '') or '').strip()
-            desc = str(row.get('商品说明', '') or '').strip()
+            party = self._clean_text(row.get('交易对方', ''))
+            desc = self._clean_text(row.get('商品说明', ''))
             # 新增：提取小时字段
-            time_str = str(row.get('交易时间', '') or '')
-            try:
-                hour = pd.to_datetime(time_str).hour
-            except Exception:
-                hour = ''
+            if hour is None:
+                hour = self._parse_hour(row.get('交易时间', ''))
             # 生成金额区间
-            fuzzy_config = self.config.get('系统设置', {}).get('金额模糊化', {})
-            enable_fuzzy = fuzzy_config.get('启用', True)
-            ignore_amount = fuzzy_config.get('忽略金额', False)
-            intervals = fuzzy_config.get('区间设置', [0, 10, 20, 50, 100, 300, 500])
-            max_label = fuzzy_config.get('超出最大区间的标识', '500+')
-            amount_part = ""
-            if not ignore_amount:
-                amount_abs = abs(amount)
-                amount_label = max_label
-                if amount_abs == 0:
-                    amount_label = "0"
-                else:
-                    for i in range(len(intervals) - 1):
-                        min_amt = intervals[i]
-                        max_amt = intervals[i + 1]
-                        if min_amt <= amount_abs < max_amt:
-                            amount_label = f"{min_amt}-{max_amt}"
-                            break
-                    amount_part = f"{amount_label}"
-
-            # 生成多个可能的键，按优先级排序
-            possible_keys = [
-                f"{amount_part}_{party}_{hour}",  # 精确匹配
-                f"{amount_part}_{party}_*",  # 通用时间匹配
-            ]
-
-            # 对于一些通用商户，添加额外的匹配键
-            generic_parties = ['余额宝', '淘宝（中国）软件有限公司', '芝麻信用', '借呗', '多多有礼', '青云租']
-            if party in generic_parties:
-                possible_keys.append(f"{amount_part}_{party}_*")
-
-            # 添加正则表达式匹配
-            import re
-            matched_rules = []
-            matched_key = None
-
-            # 遍历所有可能的键
-            for key in possible_keys:
-                # 先检查精确匹配
-                if key in self.user_classifications:
-                    rules = self.user_classifications[key]
-                    matched_rules = rules
-                    matched_key = key
-                    break
-
-            # 如果没有精确匹配，尝试正则表达式匹配
-            if not matched_rules:
-                for stored_key in self.user_classifications.keys():
-                    # 将存储的键转换为正则表达式
-                    pattern = stored_key.replace('*', '.*')
-                    test_key = f"{amount_part}_{party}_{hour}"
-                    if re.match(f"^{pattern}$", test_key):
-                        matched_rules = self.user_classifications[stored_key]
-                        matched_key = stored_key
-                        break
-
-            # 如果找到匹配的规则，尝试应用
-            if matched_rules:
-                for rule in matched_rules:
-                    try:
-                        pattern = rule.get("desc_regex", "")
-                        if pattern and re.search(pattern, desc):
-                            print(f"【调试】user_rules命中: {matched_key} | {pattern} -> {rule.get('category')}")
-                            return rule.get("category"), "user_rules"
-                    except Exception as e:
-                        print(f"【调试】user_rules正则异常: {e}")
-                # 模糊匹配（只用金额区间+对方+小时，无商品说明）
-                print(f"【调试】user_rules模糊命中: {matched_key}（无商品说明）-> {matched_rules[0].get('category')}")
-                return matched_rules[0].get('category'), "user_rules"
-
-            # 3. 未命中，输出未匹配指纹
-            print(f"【调试】user_rules未命中: {amount_part}_{party}_{hour}_{desc}")
+            if amount_part is None:
+                amount_part = self._amount_part(row.get('金额', 0))
         except Exception as e:
-            print(f"【调试】user_rules匹配异常: {e}")
-
+            logger.warning("user_rules匹配异常: %s", e)
+            return None
+        return self._match_user_rules_key(amount_part, party, hour, desc)
+
+    def _match_user_rules_key(self, amount_part: str, party: str, hour, desc: str) -> Optional[tuple]:
+        """按 (金额区间, 交易对方, 小时, 商品说明) 匹配user_rules，相同的键直接复用上次结果"""
+        cache_key = (amount_part, party, hour, desc)
+        if cache_key not in self._user_rule_cache:
+            try:
+                result = self._lookup_user_rules(*cache_key)
+            except Exception as e:
+                logger.warning("user_rules匹配异常: %s", e)
+                return None
+            if len(self._user_rule_cache) >= _MATCH_CACHE_LIMIT:
+                self._user_rule_cache.clear()
+            self._user_rule_cache[cache_key] = result
+        return self._user_rule_cache[cache_key]
+
+    @staticmethod
+    def _clean_text(value) -> str:
+        """user_rules匹配用的文本，逐行与整表分类共用"""
+        try:
+            return str(value or '').strip()
+        except TypeError:
+            # pd.NA 的真值不确定，按空值处理
+            return ''
+
+    def _lookup_user_rules(self, amount_part: str, party: str, hour, desc: str) -> Optional[tuple]:
+        """按金额区间、交易对方、小时和商品说明查找user_rules，未命中返回None"""
+        matched_key = self._resolve_rule_key(amount_part, party, hour)
+
+        # 如果找到匹配的规则，尝试应用
+        if matched_key is not None:
+            for desc_re, category in self._desc_rules.get(matched_key, []):
+                if desc_re is not None and desc_re.search(desc):
+                    logger.debug("user_rules命中: %s | %s -> %s", matched_key, desc_re.pattern, category)
+                    return category, "user_rules"
+            # 模糊匹配（只用金额区间+对方+小时，无商品说明）
+            matched_rules = self.user_classifications[matched_key]
+            logger.debug("user_rules模糊命中: %s（无商品说明）-> %s", matched_key, matched_rules[0].get('category'))
+            return matched_rules[0].get('category'), "user_rules"
+
+        # 3. 未命中，输出未匹配指纹
+        logger.debug("user_rules未命中: %s_%s_%s_%s", amount_part, party, hour, desc)
+        return None
+
+    def _resolve_rule_key(self, amount_part: str, party: str, hour) -> Optional[str]:
+        """返回 (金额区间, 交易对方, 小时) 对应的user_rules键，没有可用规则时返回None
+
+        选中的键与商品说明无关，按三元组缓存，同一对方不同商品说明的交易只查找一次键。
+        """
+        cache_key = (amount_part, party, hour)
+        if cache_key in self._rule_key_cache:
+            return self._rule_key_cache[cache_key]
+        # 生成多个可能的键，按优先级排序
+        possible_keys = [
+            f"{amount_part}_{party}_{hour}",  # 精确匹配
+            f"{amount_part}_{party}_*",  # 通用时间匹配
+        ]
+        matched_key = None
+        # 遍历所有可能的键，先检查精确匹配；键存在但规则为空时不再检查后面的键
+        for key in possible_keys:
+            if key in self.user_classifications:
+                if self.user_classifications[key]:
+                    matched_key = key
+                break
+        # 如果没有精确匹配，按索引查找通配键
+        if matched_key is None:
+            matched_key = self._find_wildcard_key(party, f"{amount_part}_{party}_{hour}")
+            if matched_key is not None and not self.user_classifications[matched_key]:
+                matched_key = None
+        if len(self._rule_key_cache) >= _MATCH_CACHE_LIMIT:
+            self._rule_key_cache.clear()
+        self._rule_key_cache[cache_key] = matched_key
+        return matched_key
+
+    def _classify_by_config(self, row: pd.Series) -> tuple:
+        """按config分类规则对单条交易分类"""
         # 1) 跨平台转账优先
         if bool(row.get('跨平台转账', False)):
             return '非收支', "config"
@@ -156,157 +421,330 @@ class TransactionClassifier:
         party = self._text(row.get('交易对方', ''))
         income_expense = self._text(row.get('收/支', ''))  # 使用收/支字段
         haystack = f"{t_type} {desc} {party}"
+        cache_key = (haystack, income_expense)
+        category = self._config_cache.get(cache_key)
+        if category is None:
+            if len(self._config_cache) >= _MATCH_CACHE_LIMIT:
+                self._config_cache.clear()
+            category = self._config_cache[cache_key] = self._match_config_keywords(haystack, income_expense)
+        return category, "config"
+
+    def _match_config_keywords(self, haystack: str, income_expense: str) -> str:
         # 2) 非收支关键词
-        for kw in self.classification_rules.get('非收支', []):
-            if self._text(kw) in haystack:
-                return '非收支', "config"
+        if self._non_income_re is not None and self._non_income_re.search(haystack):
+            return '非收支'
         # 3) 支出 / 收入
-        if '支出' in income_expense:
-            for cate, kws in self.classification_rules.get('支出', {}).items():
-                for kw in kws:
-                    if self._text(kw) in haystack:
-                        return f'支出-{cate}', "config"
-            return '支出-其他', "config"
-        if '收入' in income_expense:
-            for cate, kws in self.classification_rules.get('收入', {}).items():
-                for kw in kws:
-                    if self._text(kw) in haystack:
-                        return f'收入-{cate}', "config"
-            return '收入-其他', "config"
-        return '未分类', "config"
+        for side in ('支出', '收入'):
+            if side in income_expense:
+                return self._match_side_keywords(side, haystack) or f'{side}-其他'
+        return '未分类'
 
-    def _fingerprint(self, row: pd.Series) -> str:
-        """指纹=金额区间_交易对方_小时"""
-        party = str(row.get('交易对方', '') or '').strip()
-        time_str = str(row.get('交易时间', '') or '')
-        try:
-            hour = pd.to_datetime(time_str).hour
-        except Exception:
-            hour = ''
-
-        # 金额区间
-        fuzzy_config = self.config.get('系统设置', {}).get('金额模糊化', {})
-        intervals = fuzzy_config.get('区间设置', [0, 10, 20, 50, 100, 300, 500])
-        max_label = fuzzy_config.get('超出最大区间的标识', '500+')
-        amount = row.get('金额', 0)
-        try:
-            amount_val = float(amount)
-        except Exception:
-            amount_val = 0.0
-        amount_abs = abs(amount_val)
-        amount_label = max_label
-        for i in range(len(intervals) - 1):
-            if intervals[i] <= amount_abs < intervals[i + 1]:
-                amount_label = f"{intervals[i]}-{intervals[i + 1]}"
-                break
+    def _build_keyword_matchers(self):
+        """把config关键词编译为每侧一个正则，单条分类只需扫描一遍文本
 
-        return f"{amount_label}_{party}_{hour}"
+        支出/收入的关键词按规则优先级排成一个前瞻分支 (?=(kw1|kw2|...))，
+        每个位置命中的都是从该位置开始、优先级最高的关键词，
+        扫描全文取优先级最小者即与逐个关键词判断的结果一致。
+        """
+        self._config_cache: Dict[tuple, str] = {}
+        non_income = [self._text(kw) for kw in self.classification_rules.get('非收支', [])]
+        self._non_income_re = re.compile('|'.join(map(re.escape, non_income))) if non_income else None
+        self._side_matchers = {}
+        for side in ('支出', '收入'):
+            labels: Dict[str, tuple] = {}
+            for cate, kws in self.classification_rules.get(side, {}).items():
+                for kw in kws:
+                    labels.setdefault(self._text(kw), (len(labels), f'{side}-{cate}'))
+            if labels:
+                pattern = re.compile('(?=(' + '|'.join(map(re.escape, labels)) + '))')
+                self._side_matchers[side] = (pattern, labels)
+
+    def _match_side_keywords(self, side: str, haystack: str) -> Optional[str]:
+        """返回haystack命中的优先级最高的分类，未命中返回None"""
+        matcher = self._side_matchers.get(side)
+        if matcher is None:
+            return None
+        pattern, labels = matcher
+        best = None
+        for m in pattern.finditer(haystack):
+            hit = labels[m.group(1)]
+            if best is None or hit[0] < best[0]:
+                best = hit
+                if best[0] == 0:
+                    break
+        return best[1] if best else None
+
+    def _amount_label(self, amount_abs: float) -> str:
+        """二分查找金额所在区间，返回区间标签，超出区间时返回最大区间标识"""
+        idx = bisect_right(self._interval_bounds, amount_abs) - 1
+        if 0 <= idx < len(self._interval_labels) - 1:
+            return self._interval_labels[idx]
+        return self._interval_labels[-1]
+
+    def _amount_labels(self, amounts_abs: np.ndarray) -> np.ndarray:
+        """整列查找金额区间标签，结果与逐个 _amount_label 一致"""
+        labels = self._interval_label_arr
+        idx = np.searchsorted(self._interval_arr, amounts_abs, side='right') - 1
+        idx[(idx < 0) | (idx >= len(labels) - 1)] = len(labels) - 1
+        return labels[idx]
+
+    def _amount_part(self, amount) -> str:
+        """user_rules键中的金额部分：金额为0或忽略金额时为空，否则为区间标签；金额无效时抛出异常"""
+        amount_abs = abs(float(amount or 0))
+        if self._ignore_amount or amount_abs == 0:
+            return ""
+        return self._amount_label(amount_abs)
+
+    def _amount_parts(self, values: pd.Series) -> np.ndarray:
+        """整列计算金额部分，无法转换为数值的位置为None"""
+        amounts = None
+        if pd.api.types.is_numeric_dtype(values):
+            amounts = values.to_numpy(dtype=float, na_value=np.nan)
+        elif values.notna().all():
+            # 文本金额能整列转为浮点数时同样走整列查找；含空值或无效值时逐个处理
+            try:
+                amounts = values.to_numpy().astype(float)
+            except (TypeError, ValueError):
+                pass
+        if amounts is not None:
+            if self._ignore_amount:
+                return np.full(len(values), "", dtype=object)
+            amounts_abs = np.abs(amounts)
+            return np.where(amounts_abs == 0, "", self._amount_labels(amounts_abs)).astype(object)
+        def safe_amount_part(value):
+            try:
+                return self._amount_part(value)
+            except Exception:
+                return None
+        return self._map_unique(values, safe_amount_part)
 
     def _fingerprint(self, row: pd.Series) -> str:
         """指纹=金额区间_交易对方_小时"""
         party = str(row.get('交易对方', '') or '').strip()
-        time_str = str(row.get('交易时间', '') or '')
-        try:
-            hour = pd.to_datetime(time_str).hour
-        except Exception:
-            hour = ''
+        hour = self._parse_hour(row.get('交易时间', ''))
 
         # 金额区间
-        fuzzy_config = self.config.get('系统设置', {}).get('金额模糊化', {})
-        intervals = fuzzy_config.get('区间设置', [0, 10, 20, 50, 100, 300, 500])
-        max_label = fuzzy_config.get('超出最大区间的标识', '500+')
         amount = row.get('金额', 0)
         try:
             amount_val = float(amount)
         except Exception:
             amount_val = 0.0
-        amount_abs = abs(amount_val)
-        amount_label = max_label
-        for i in range(len(intervals) - 1):
-            if intervals[i] <= amount_abs < intervals[i + 1]:
-                amount_label = f"{intervals[i]}-{intervals[i + 1]}"
-                break
+        amount_label = self._amount_label(abs(amount_val))
 
         # 对于一些通用商户，使用更通用的指纹
-        generic_parties = ['拼多多平台商户', '抖音电商商家', '淘宝（中国）软件有限公司', '芝麻信用', '多多有礼', '借呗',
-                           '余额宝']
-        if party in generic_parties:
+        if party in _GENERIC_PARTIES:
             return f"{amount_label}_{party}_*"
 
         return f"{amount_label}_{party}_{hour}"
 
+    def _fingerprints(self, df: pd.DataFrame) -> np.ndarray:
+        """整表计算指纹，结果与逐行 _fingerprint 一致"""
+        amounts = self._column(df, '金额')
+        if amounts.dtype.kind in 'iuf':
+            if isinstance(amounts.dtype, pd.api.extensions.ExtensionDtype):
+                # 可空数值列（Int64等）的pd.NA：逐行 float(pd.NA) 失败按0处理，这里同样按0
+                amounts = amounts.fillna(0)
+            amount_vals = amounts.to_numpy(dtype=float)
+        else:
+            def safe_float(value):
+                try:
+                    return float(value)
+                except Exception:
+                    return 0.0
+            amount_vals = self._map_unique(amounts, safe_float).astype(float)
+        labels = self._amount_labels(np.abs(amount_vals))
+        parties = self._map_unique(self._column(df, '交易对方'), self._clean_text)
+        hours = self._parse_hours(self._column(df, '交易时间'))
+        return np.array([f"{label}_{party}_{'*' if party in _GENERIC_PARTIES else hour}"
+                         for label, party, hour in zip(labels, parties, hours)], dtype=object)
+
     def classify_all_transactions(self, df: pd.DataFrame) -> pd.DataFrame:
-        """分类所有交易记录，优先应用user_rules"""
+        """分类所有交易记录，优先应用user_rules
+
+        已分类的数据只对“分类”为空的行（如新追加的账单）补充分类，其余行保持不变。
+        """
+        pending = None
         if '分类' in df.columns and '分类来源' in df.columns:
-            return df  # 如果已经分类，直接返回，避免重复计算
-        df_copy = df.copy()
-        # 添加分类字段和分类来源字段
-        results = df_copy.apply(self.classify_transaction, axis=1)
-        df_copy['分类'] = results.apply(lambda x: x[0])
-        df_copy['分类来源'] = results.apply(lambda x: x[1])
-
-        # 设置调整后分类和调整后子分类字段
-        df_copy['调整后分类'] = df_copy['分类']
-        df_copy['调整后子分类'] = df_copy['分类'].apply(
-            lambda x: x.split('-')[-1] if isinstance(x, str) and '-' in x else str(x)
-        )
+            pending = df['分类'].isna().to_numpy()
+            if not pending.any():
+                return df  # 如果已经全部分类，直接返回，避免重复计算
+        # 浅复制即可：只新增或整列替换分类相关列，不修改原有列
+        df_copy = df.copy(deep=False)
+        if pending is None:
+            categories, sources = self._classify_frame(df_copy)
+        else:
+            new_categories, new_sources = self._classify_frame(df_copy.loc[pending])
+            categories = df_copy['分类'].to_numpy(dtype=object).copy()
+            sources = df_copy['分类来源'].to_numpy(dtype=object).copy()
+            categories[pending] = new_categories
+            sources[pending] = new_sources
+
+        # 分类和分类来源取值很少，存为Categorical（每行只占整数编码），类别只含实际出现的值
+        df_copy['分类'] = pd.Categorical(categories)
+        df_copy['分类来源'] = pd.Categorical(sources)
+
+        # 设置调整后分类和调整后子分类字段；调整后分类供手动修改，保持普通字符串列
+        # 子分类只取决于分类值，每个不同的分类只拆分一次，不逐行回调
+        sub_categories = self._map_unique(
+            pd.Series(categories, dtype=object),
+            lambda x: x.split('-')[-1] if isinstance(x, str) and '-' in x else str(x))
+        if pending is not None:
+            # 已分类行保留原有（可能手动调整过的）值
+            for col, values in (('调整后分类', categories), ('调整后子分类', sub_categories)):
+                if col in df_copy.columns:
+                    values[~pending] = df_copy[col].to_numpy(dtype=object)[~pending]
+        df_copy['调整后分类'] = categories
+        df_copy['调整后子分类'] = sub_categories
 
         return df_copy
 
+    def _classify_frame(self, df: pd.DataFrame) -> tuple:
+        """对一批交易分类，返回 (分类数组, 分类来源数组)"""
+        # 1) 失败状态整列判断
+        # 交易状态取值很少，每个不同的状态只判断一次
+        failed = self._map_unique(
+            self._column(df, '交易状态'),
+            lambda v: not self._is_missing(v) and bool(_FAIL_STATUS_RE.search(str(v)))
+        ).astype(bool)
+
+        # 2) user_rules 匹配（仅非失败行）：整列算出每行的匹配键，每个不同的键只匹配一次
+        user_cats = np.full(len(df), None, dtype=object)
+        user_hit = np.zeros(len(df), dtype=bool)
+        amount_parts = self._amount_parts(self._column(df, '金额'))
+        # 金额无法转换为数值的行不参与user_rules匹配
+        candidates = np.flatnonzero(~failed & (amount_parts != None))  # noqa: E711 逐元素比较
+        if len(candidates):
+            keys = pd.Series(list(zip(
+                amount_parts[candidates],
+                self._map_unique(self._column(df, '交易对方').iloc[candidates], self._clean_text),
+                self._parse_hours(self._column(df, '交易时间').iloc[candidates]),
+                self._map_unique(self._column(df, '商品说明').iloc[candidates], self._clean_text),
+            )), dtype=object)
+            codes, unique_keys = pd.factorize(keys)
+            matched = [self._match_user_rules_key(*key) for key in unique_keys]
+            hit = np.array([m is not None for m in matched])[codes]
+            user_hit[candidates] = hit
+            user_cats[candidates[hit]] = np.array([m[0] if m else None for m in matched], dtype=object)[codes][hit]
+
+        # 3) config规则整列匹配
+        config_cats = self._classify_by_config_vectorized(df, self._prepare_lowercased(df))
+
+        # 优先级：失败状态 > user_rules > config
+        categories = np.where(failed, '未达到分类要求', np.where(user_hit, user_cats, config_cats))
+        sources = np.where(failed, 'status_filter', np.where(user_hit, 'user_rules', 'config')).astype(object)
+        return categories, sources
+
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str) -> pd.Series:
+        """取列，不存在时返回等长的空字符串列"""
+        if name in df.columns:
+            return df[name]
+        return pd.Series('', index=df.index, dtype=object)
+
+    @staticmethod
+    def _is_missing(value) -> bool:
+        """与fillna一致的空值判断（None、NaN、NaT、pd.NA）"""
+        return pd.api.types.is_scalar(value) and bool(pd.isna(value))
+
+    def _prepare_lowercased(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        """一次性把分类用到的文本列按 _text 转为小写，后续各步骤共用；每个不同的值只转换一次"""
+        return {name: pd.Series(self._map_unique(self._column(df, name), self._text), index=df.index, dtype=object)
+                for name in ('交易分类', '商品说明', '交易对方', '收/支')}
+
+    def _classify_by_config_vectorized(self, df: pd.DataFrame,
+                                       lowered: Optional[Dict[str, pd.Series]] = None) -> np.ndarray:
+        """整列执行config规则分类，结果与逐行 _classify_by_config 一致
+
+        每个不同的 (文本, 收/支) 组合只用各侧的单遍关键词正则匹配一次，
+        不再按分类逐个整列扫描。
+        """
+        if lowered is None:
+            lowered = self._prepare_lowercased(df)
+        haystack = lowered['交易分类'] + ' ' + lowered['商品说明'] + ' ' + lowered['交易对方']
+        keys = pd.Series(list(zip(haystack, lowered['收/支'])), dtype=object)
+        codes, unique_keys = pd.factorize(keys)
+        categories = np.array([self._match_config_keywords(*key) for key in unique_keys] + ['未分类'],
+                              dtype=object)[codes]
+        # 跨平台转账优先
+        transfer = self._column(df, '跨平台转账').astype(bool).to_numpy()
+        categories[transfer] = '非收支'
+        return categories
+
     def add_user_classification(self, row: pd.Series, classification: str, persist: bool = True):
-        self.user_classifications[self._fingerprint(row)] = classification
+        fingerprint = self._fingerprint(row)
+        # 与后台合并写入互斥，避免序列化时字典被修改
+        with self._rules_lock:
+            self.user_classifications[fingerprint] = classification
+        self._reindex_rules([fingerprint])
+        if persist:
+            self._append_rule_log([(fingerprint, classification)])
+
+    def add_user_classifications(self, rows: pd.DataFrame, classifications, persist: bool = True):
+        """批量记忆分类：整表计算指纹，只更新一次索引、追加一次日志
+
+        classifications 为单个分类（所有行相同）或与rows等长的分类序列。
+        """
+        if isinstance(classifications, str):
+            classifications = [classifications] * len(rows)
+        entries = list(zip(self._fingerprints(rows), classifications))
+        if not entries:
+            return
+        with self._rules_lock:
+            self.user_classifications.update(entries)
+        self._reindex_rules(fp for fp, _ in entries)
         if persist:
-            self.save_user_rules()
+            self._append_rule_log(entries)
 
     def get_classification_statistics(self, df: pd.DataFrame) -> Dict:
-        print("【调试】进入 get_classification_statistics，数据行数：", len(df))
+        logger.debug("进入 get_classification_statistics，数据行数：%d", len(df))
         stats: Dict = {}
         try:
             # 检查关键字段
-            print("【调试】字段列表：", df.columns.tolist())
+            logger.debug("字段列表：%s", df.columns.tolist())
             # 关键：先检查“分类”或“调整后分类”字段是否存在，不存在则用默认字段
             if '调整后分类' in df.columns and not df['调整后分类'].empty:
-                category_field = '调整后分类'
+                categories = df['调整后分类']
             elif '分类' in df.columns and not df['分类'].empty:
-                category_field = '分类'
+                categories = df['分类']
             else:
-                # 若都没有，临时添加“分类”字段（避免报错）
-                df['分类'] = '未分类'
-                category_field = '分类'
+                # 若都没有，按“未分类”统计（不修改传入的数据）
+                categories = pd.Series('未分类', index=df.index, name='分类')
 
-            # 金额字段类型转换
-            df_copy = df.copy()
-            df_copy['金额'] = pd.to_numeric(df_copy['金额'], errors='coerce').fillna(0)
+            # 金额字段类型转换，只转换金额列，不复制整表
+            amounts = pd.to_numeric(df['金额'], errors='coerce').fillna(0)
+            amt = amounts.to_numpy()
 
             # 统计前输出部分数据
-            print("【调试】分类字段样例：", df_copy[category_field].head(5).tolist())
-            print("【调试】金额字段样例：", df_copy['金额'].head(5).tolist())
-
-            # 计算总收入/总支出
-            stats['总收入'] = df_copy[df_copy[category_field].str.startswith('收入', na=False)]['金额'].sum()
-            stats['总支出'] = df_copy[df_copy[category_field].str.startswith('支出', na=False)]['金额'].sum()
-            stats['非收支总额'] = df_copy[df_copy[category_field] == '非收支']['金额'].sum()
+            logger.debug("分类字段样例：%s", categories.head(5).tolist())
+            logger.debug("金额字段样例：%s", amounts.head(5).tolist())
+
+            # 按分类只分组一次求金额小计，总收入/总支出/非收支由各分类的小计汇总，不再逐项扫描金额列
+            category_sums = amounts.groupby(categories, dropna=False, observed=True).sum()
+            labels = category_sums.index.astype(str)
+            stats['总收入'] = category_sums[labels.str.startswith('收入')].sum()
+            stats['总支出'] = category_sums[labels.str.startswith('支出')].sum()
+            stats['非收支总额'] = category_sums[labels == '非收支'].sum()
             stats['净收入'] = stats['总收入'] - stats['总支出']
 
             # 分类统计
             stats['分类统计'] = {
-                '数量': df_copy[category_field].value_counts(dropna=False).to_dict(),
-                '金额': df_copy.groupby(category_field, dropna=False)['金额'].sum().to_dict()
+                # Categorical列按对象计数，筛选后的子集不会带出数量为0的分类
+                '数量': categories.astype(object).value_counts(dropna=False).to_dict(),
+                '金额': category_sums.to_dict()
             }
 
             # 平台统计
-            if '平台' in df_copy.columns:
-                platform_agg = df_copy.groupby('平台', dropna=False)['金额'].agg(['sum', 'count']).round(2)
+            if '平台' in df.columns:
+                platform_agg = amounts.groupby(df['平台'], dropna=False, observed=True).agg(['sum', 'count']).round(2)
                 stats['平台统计'] = platform_agg.to_dict()
             else:
                 stats['平台统计'] = {'sum': {}, 'count': {}}
 
-            print("【调试】统计结果预览：", {k: str(v)[:200] for k, v in stats.items()})
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("统计结果预览：%s", {k: str(v)[:200] for k, v in stats.items()})
             return stats
         except Exception as e:
-            import traceback
-            print("【调试】get_classification_statistics异常：", str(e))
-            print(traceback.format_exc())
+            logger.exception("get_classification_statistics异常：%s", e)
             # 返回空统计，避免程序崩溃
             return {
                 '总收入': 0, '总支出': 0, '净收入': 0,
@@ -315,38 +753,74 @@ class TransactionClassifier:
             }
 
     def get_daily_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_copy = df.copy()
-        df_copy['日期'] = pd.to_datetime(df_copy['交易时间'], errors='coerce').dt.date
-        daily = df_copy.groupby('日期', dropna=True).apply(
-            lambda g: pd.Series({
-                '收入': g[g['分类'].str.startswith('收入', na=False)]['金额'].sum(),
-                '支出': g[g['分类'].str.startswith('支出', na=False)]['金额'].sum()
-            })
-        ).reset_index()
+        # 收入/支出金额按掩码拆成两列，再整体按日期分组求和，避免逐组回调Python
+        # 按datetime64的零点分组，分组后才把每天转为date对象，不逐行生成date
+        income_mask, expense_mask = self._prefix_masks(df['分类'], '收入', '支出')
+        amounts = df['金额']
+        df_copy = pd.DataFrame({
+            '日期': pd.to_datetime(df['交易时间'], errors='coerce').dt.normalize(),
+            '收入': amounts.where(income_mask, 0),
+            '支出': amounts.where(expense_mask, 0),
+        })
+        daily = df_copy.groupby('日期', dropna=True)[['收入', '支出']].sum().reset_index()
+        daily['日期'] = daily['日期'].dt.date
         if not daily.empty:
             daily['净额'] = daily['收入'] - daily['支出']
         return daily
     
+    @staticmethod
+    def _prefix_masks(categories: pd.Series, *prefixes: str) -> list:
+        """返回分类以各前缀开头的掩码列表；分类取值很少，每个不同的分类只判断一次，空值为False"""
+        if isinstance(categories.dtype, pd.CategoricalDtype):
+            codes = categories.cat.codes.to_numpy()
+            uniques = categories.cat.categories
+        else:
+            codes, uniques = pd.factorize(categories)
+        labels = pd.Index(uniques, dtype=object).astype(str)
+        # 编码-1（空值）取追加在末尾的False
+        return [np.append(labels.str.startswith(prefix), False)[codes] for prefix in prefixes]
+
+    def compute_text_statistics(self, df: pd.DataFrame, queries: Dict[str, tuple]) -> Dict[str, Dict]:
+        """一次扫描计算多组关键词统计
+
+        queries 为 {名称: (文本列, 关键词列表, 分类前缀)}，任一文本列包含任一关键词即命中，
+        分类前缀不为None时还要求分类以该前缀开头。各查询的关键词合并为一个正则；
+        各查询共用的文本列只转换小写一次，并且只对每个不同的文本做匹配。
+        """
+        texts: Dict[str, tuple] = {}
+        amounts = df['金额']
+        results = {}
+        for name, (columns, keywords, prefix) in queries.items():
+            pattern = re.compile('|'.join(re.escape(self._text(kw)) for kw in keywords))
+            mask = np.zeros(len(df), dtype=bool)
+            for col in columns:
+                if col not in texts:
+                    lowered = pd.Series(self._map_unique(df[col], lambda v: str(v).lower()), dtype=object)
+                    texts[col] = pd.factorize(lowered)
+                codes, uniques = texts[col]
+                hits = np.array([pattern.search(text) is not None for text in uniques] + [False])
+                mask |= hits[codes]
+            if prefix is not None:
+                mask &= self._prefix_masks(df['分类'], prefix)[0]
+            results[name] = {
+                '金额': float(amounts[mask].sum() if mask.any() else 0),
+                '笔数': int(mask.sum())
+            }
+        return results
+
+    @staticmethod
+    def _special_query(keyword: str) -> tuple:
+        return ('商品说明', '交易对方'), [keyword], '支出'
+
     def get_special_statistics(self, df: pd.DataFrame, keyword: str = '馒头') -> Dict:
-        kw = self._text(keyword)
-        g = df[(df['分类'].str.startswith('支出', na=False)) & (
-            df['商品说明'].astype(str).str.lower().str.contains(kw, na=False) |
-            df['交易对方'].astype(str).str.lower().str.contains(kw, na=False)
-        )]
-        return {
-            '金额': float(g['金额'].sum() if not g.empty else 0),
-            '笔数': int(len(g))
-        }
+        return self.compute_text_statistics(df, {'special': self._special_query(keyword)})['special']
     
     def get_finance_refund_statistics(self, df: pd.DataFrame) -> Dict:
-        finance_kws = ['理财', '基金', '余额宝']
-        refund_kw = '退款'
-        hay = (df['交易分类'].astype(str).str.lower() + ' ' + df['商品说明'].astype(str).str.lower())
-        mask = hay.str.contains(refund_kw.lower(), na=False)
-        for k in finance_kws:
-            mask = mask | hay.str.contains(k.lower(), na=False)
-        g = df[mask]
-        return {
-            '金额': float(g['金额'].sum() if not g.empty else 0),
-            '笔数': int(len(g))
-        }
+        return self.compute_text_statistics(df, {'finance': _FINANCE_REFUND_QUERY})['finance']
+
+    def get_special_report(self, df: pd.DataFrame, keyword: str = '馒头') -> Dict[str, Dict]:
+        """报告用的专项统计，"馒头"支出和理财退款两项共用一次文本扫描"""
+        return self.compute_text_statistics(df, {
+            f'"{keyword}"支出统计': self._special_query(keyword),
+            '理财退款统计': _FINANCE_REFUND_QUERY,
+        })
@@ -5,11 +5,39 @@
 
 import os
 import json
+import functools
 import logging
+import re
+from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
+import time
 import traceback
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 检测编码时读取的文件开头字节数
+_ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# clean_date 快速路径只处理的两种ISO形式：2024-01-01 12:00:00 / 2024-01-01
+_ISO_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}( [0-9]{2}:[0-9]{2}:[0-9]{2})?')
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """序列化为UTF-8字节，已安装orjson时使用orjson"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def json_loads(data: bytes):
+    """解析JSON字节串，已安装orjson时使用orjson"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
 class Logger:
     """日志管理器"""
@@ -17,9 +45,15 @@ class Logger:
     def __init__(self, log_file: str = "app.log"):
         self.logger = logging.getLogger("PersonalFinanceManager")
         self.logger.setLevel(logging.INFO)
+        # 已由其他Logger实例配置过处理器时直接复用，避免重复输出和重复打开日志文件
+        if self.logger.handlers:
+            return
+        # 不再传递给根日志器，避免同一条日志输出两次
+        self.logger.propagate = False
         
-        # 创建文件处理器
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # 创建文件处理器：首次写日志时才打开文件，超过5MB轮转
+        file_handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3,
+                                           encoding='utf-8', delay=True)
         file_handler.setLevel(logging.INFO)
         
         # 创建控制台处理器
@@ -61,8 +95,8 @@ class ConfigManager:
         """加载配置文件"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    return json_loads(f.read())
             else:
                 return self.get_default_config()
         except Exception as e:
@@ -72,8 +106,8 @@ class ConfigManager:
     def save_config(self):
         """保存配置文件"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
+            with open(self.config_file, 'wb') as f:
+                f.write(json_dumps(self.config, indent=True))
         except Exception as e:
             print(f"保存配置文件失败: {e}")
     
@@ -250,12 +284,12 @@ class FileManager:
             return "0B"
         
         size_names = ["B", "KB", "MB", "GB"]
+        # 每个单位相差2^10倍，由整数位数直接算出单位，不必循环相除
         i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
+        if size_bytes >= 1024:
+            i = min((int(size_bytes).bit_length() - 1) // 10, len(size_names) - 1)
         
-        return f"{size_bytes:.1f}{size_names[i]}"
+        return f"{size_bytes / (1 << (10 * i)):.1f}{size_names[i]}"
 
 
 class DataProcessor:
@@ -281,6 +315,14 @@ class DataProcessor:
     def clean_date(self, date_str: str) -> Optional[datetime]:
         """清理日期数据"""
         try:
+            # 最常见的 2024-01-01 12:00:00 / 2024-01-01 直接按ISO格式解析，不必逐个尝试格式；
+            # fromisoformat 还接受紧凑格式、T分隔、小数秒和时区偏移，先确认是这两种形式
+            if isinstance(date_str, str) and _ISO_DATE_RE.fullmatch(date_str):
+                try:
+                    return datetime.fromisoformat(date_str)
+                except ValueError:
+                    pass
+            
             # 尝试多种日期格式
             formats = [
                 '%Y-%m-%d %H:%M:%S',
@@ -312,19 +354,27 @@ class DataProcessor:
         return text.strip()
     
     def detect_encoding(self, file_path: str) -> str:
-        """检测文件编码"""
+        """检测文件编码，同一文件未修改时直接返回上次的结果"""
         try:
-            import chardet
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                return result['encoding'] or 'utf-8'
-        except ImportError:
-            return 'utf-8'
+            stat = os.stat(file_path)
+            return _detect_encoding(file_path, stat.st_mtime_ns, stat.st_size)
         except Exception:
             return 'utf-8'
 
 
+@functools.lru_cache(maxsize=128)
+def _detect_encoding(file_path: str, mtime_ns: int, size: int) -> str:
+    """按 (路径, 修改时间, 大小) 缓存的编码检测，只读取文件开头部分"""
+    try:
+        import chardet
+    except ImportError:
+        return 'utf-8'
+    with open(file_path, 'rb') as f:
+        raw_data = f.read(_ENCODING_SAMPLE_SIZE)
+    result = chardet.detect(raw_data)
+    return result['encoding'] or 'utf-8'
+
+
 class PerformanceMonitor:
     """性能监控器"""
     
@@ -334,13 +384,13 @@ class PerformanceMonitor:
     
     def start_timer(self, name: str):
         """开始计时"""
-        self.start_times[name] = datetime.now()
+        self.start_times[name] = time.perf_counter_ns()
     
     def end_timer(self, name: str) -> float:
         """结束计时并返回耗时（秒）"""
         if name in self.start_times:
-            elapsed = datetime.now() - self.start_times[name]
-            seconds = elapsed.total_seconds()
+            # 单调高精度计时，不受系统时间调整影响
+            seconds = (time.perf_counter_ns() - self.start_times[name]) / 1e9
             self.logger.info(f"{name} 耗时: {seconds:.2f}秒")
             del self.start_times[name]
             return seconds